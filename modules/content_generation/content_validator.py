@@ -1,7 +1,164 @@
 import logging
 import re
 from typing import Dict, Optional
-import emoji
+
+try:
+    import re2  # google-re2: линейное время сопоставления, без катастрофического backtracking
+except ImportError:
+    re2 = None
+
+try:
+    import hyperscan  # Опционально: SIMD-префильтр для набора паттернов _clean_junk
+except ImportError:
+    hyperscan = None
+
+try:
+    import numpy as np
+    from numba import njit  # Опционально: нативный скан кодовых точек
+except ImportError:
+    np = None
+    njit = None
+
+
+class _LinearPattern:
+    """
+    Паттерн re2 с запасным стандартным re. re2 кодирует текст в UTF-8 и падает на одиночных
+    суррогатах (их даёт JSON от LLM, например "\\ud83d"), а re такие строки обрабатывает.
+    """
+
+    def __init__(self, pattern: str, compiled):
+        self.pattern = pattern
+        self._re2 = compiled
+        self._re = None
+
+    def _fallback(self):
+        if self._re is None:
+            self._re = re.compile(self.pattern)
+        return self._re
+
+    def sub(self, repl, string: str, count: int = 0) -> str:
+        try:
+            return self._re2.sub(repl, string, count)
+        except UnicodeEncodeError:
+            return self._fallback().sub(repl, string, count)
+
+    def search(self, string: str):
+        try:
+            return self._re2.search(string)
+        except UnicodeEncodeError:
+            return self._fallback().search(string)
+
+    def finditer(self, string: str):
+        # re2 кодирует строку до первого совпадения, так что ошибка возникает раньше любого yield
+        try:
+            yield from self._re2.finditer(string)
+        except UnicodeEncodeError:
+            yield from self._fallback().finditer(string)
+
+
+# \s в re2 только ASCII (без NBSP, \x1c-\x1f, \u2000-\u200a ...). Для re2-паттернов явный класс
+# из тех же символов, что покрывает \s в re для str. Символы передаются как есть: \uXXXX re2 не понимает
+_WS = "[" + "".join(chr(c) for c in range(0x3001) if chr(c).isspace()) + "]"
+
+
+def _compile_linear(pattern: str):
+    """
+    Компилирует паттерн движком re2, если он установлен и понимает синтаксис, иначе стандартным re.
+    Флаги передаются только inline ((?i), (?m), (?s)), чтобы паттерн был одинаков для обоих движков.
+    """
+    if re2 is not None:
+        try:
+            return _LinearPattern(pattern, re2.compile(pattern))
+        except Exception:
+            pass
+    return re.compile(pattern)
+
+
+# Триггеры re_junk_drop, re_junk_punct, re_js_links и re_junk_space для hyperscan. Это надмножество:
+# без \b (UTF-8 режим hyperscan не поддерживает юникодный \b) и только префиксы. Если ни один
+# не найден, проходы regex заведомо ничего не заменят
+_JUNK_TRIGGERS = (
+    r'nan|none|null',
+    '[\u200b-\u200f\u202a-\u202e]',
+    r'\\x[0-9a-f]{2}',
+    r'_x[0-9a-f]{4}_',
+    r'&[a-z0-9#]+;',
+    r'\[[^\]]+\]\((?:javascript|data):',
+    r'\.{3}',
+    r',,',
+    r' {2}',
+    r'\n{3}',
+)
+
+
+def _build_junk_prefilter():
+    if hyperscan is None:
+        return None
+    try:
+        db = hyperscan.Database()
+        db.compile(
+            expressions=[p.encode("utf-8") for p in _JUNK_TRIGGERS],
+            ids=list(range(len(_JUNK_TRIGGERS))),
+            elements=len(_JUNK_TRIGGERS),
+            flags=[hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH]
+            * len(_JUNK_TRIGGERS),
+        )
+        return db
+    except Exception as e:
+        logging.getLogger("ContentValidator").warning(f"Hyperscan prefilter disabled: {e}")
+        return None
+
+
+_JUNK_PREFILTER = _build_junk_prefilter()
+
+
+def _stop_on_match(id_, start, end, flags, context):
+    context.append(id_)
+    return True
+
+
+# Диапазоны кодовых точек, которые считаются emoji при фильтрации спама
+_EMOJI_RANGES = (
+    (0x1F300, 0x1F5FF), (0x1F600, 0x1F64F), (0x1F680, 0x1F6FF), (0x1F700, 0x1F7FF),
+    (0x1F800, 0x1F8FF), (0x1F900, 0x1F9FF), (0x1FA00, 0x1FAFF), (0x2702, 0x27B0),
+)
+
+
+if njit is not None:
+    # Без cache=True: кэш numba привязан к имени модуля и ломается при импорте под другим именем
+    @njit
+    def _has_char_run_codepoints(cp, run_length):
+        """То же, что re_repeated_chars.search: символ (кроме \\n) подряд run_length раз."""
+        prev = 10
+        run = 0
+        for i in range(cp.shape[0]):
+            c = cp[i]
+            if c == 10:
+                prev = 10
+                run = 0
+            elif c == prev:
+                run += 1
+                if run >= run_length:
+                    return True
+            else:
+                prev = c
+                run = 1
+        return False
+else:
+    _has_char_run_codepoints = None
+
+
+def _codepoints(text: str):
+    """
+    Строка как массив кодовых точек UTF-32 для функций на numba.
+    Для строк с одиночными суррогатами возвращает None — тогда используется путь на regex.
+    """
+    try:
+        data = text.encode("utf-32-le")
+    except UnicodeEncodeError:
+        return None
+    return np.frombuffer(data, dtype=np.uint32)
+
 
 class ContentValidator:
     TELEGRAM_TEXT_LIMIT = 4096
@@ -9,56 +166,107 @@ class ContentValidator:
     MIN_CONTENT_LENGTH = 15
     MAX_EMOJI_FRACTION = 0.5
     MAX_EMOJI_RUN = 5
+    REPEATED_CHAR_RUN = 11
 
     # Только теги, поддерживаемые Telegram: https://core.telegram.org/bots/api#formatting-options
     ALLOWED_TAGS = {
         "b", "strong", "i", "em", "u", "ins", "s", "strike", "del", "code", "pre", "a"
     }
 
+    # Экранирование для содержимого <pre>/<code>: все три замены за один проход translate
+    HTML_ESCAPE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+
+    # Допустимые символы текста: управляющие \t \n \r, печатный ASCII, кириллица и №.
+    # Остальные удаляются в _remove_invalid_chars
+    ALLOWED_CHARS = frozenset(
+        "\t\n\r" + "".join(map(chr, range(0x20, 0x7F)))
+        + "".join(map(chr, range(ord("А"), ord("я") + 1))) + "ёЁ№"
+    )
+
+    # Теги Telegram для именованных групп re_markdown
+    MARKDOWN_TAGS = {"b1": "b", "b2": "b", "i1": "i", "i2": "i", "s": "s"}
+    # Символы, без которых не срабатывает ни одна ветка re_markdown
+    MARKDOWN_CHARS = "*_~`["
+
+    # Замены для именованных групп re_junk_punct и re_junk_space
+    JUNK_REPLACEMENTS = {
+        "dots": "…",
+        "commas": ",",
+        "spaces": " ",
+        "newlines": "\n\n",
+    }
+
+    # Паттерны компилируются один раз на класс, а не на каждый экземпляр.
+    # Паттерны без lookaround/backreference/юникодного \b идут через re2 (линейное время).
+    re_table_md = _compile_linear(
+        r'(?m)(?:\|[^\n|]+\|[^\n]*\n)+(?:\|[-:| ]+\|[^\n]*\n)+(?:\|[^\n|]+\|[^\n]*\n?)+'
+    )
+    re_table_html = _compile_linear(r'(?i)<table[\s\S]*?</table>')
+    re_think = _compile_linear(
+        r'(?i)<' + _WS + r'*think[^>]*>[\s\S]*?<' + _WS + r'*/' + _WS + r'*think' + _WS + r'*>'
+    )
+    # Фрагменты-вариации ("размышления:", "---", "think:" ...). Отдельный проход после re_think:
+    # фрагмент может сложиться только на месте удалённого блока ("<think>..</think>Think:")
+    re_think_frag = _compile_linear(
+        r'(?im)размышления:|---|думаю:|#' + _WS + r'*think' + _WS + r'*|^' + _WS + r'*think' + _WS + r'*:'
+    )
+    # Любой тег, имя которого не входит в ALLOWED_TAGS: решение принимает сам regex, без callback (lookahead, поэтому re).
+    # (?![a-zA-Z0-9]) после имени повторяет прежнюю границу имени [a-zA-Z0-9]+ (<b_x>, <a-x>)
+    re_forbidden_tag = re.compile(
+        r'(?i)</?(?!(?:' + '|'.join(sorted(ALLOWED_TAGS)) + r')(?![a-zA-Z0-9]))[a-zA-Z0-9]+[^>]*>'
+    )
+    # Удаляемый мусор (null-значения, zero-width, \xNN, _xNNNN_, html-сущности) — одним проходом.
+    # \b в re2 только ASCII: "nullтекст" там разорвался бы на границе, поэтому оставляем re
+    re_junk_drop = re.compile(
+        r'(?i:\b(?:nan|none|null)\b)'
+        '|[\u200b-\u200f\u202a-\u202e]+'
+        r'|\\x[0-9a-fA-F]{2}'
+        r'|_x[0-9A-Fa-f]{4}_'
+        r'|&[a-zA-Z0-9#]+;'
+    )
+    # Нормализация в порядке прежних проходов: многоточия и запятые, затем js/data-ссылки,
+    # затем пробелы и переводы строк — так пробелы вокруг убранной ссылки тоже схлопываются.
+    # Замена в _junk_repl выбирается по имени сработавшей группы
+    re_junk_punct = _compile_linear(r'(?P<dots>\.{3,})|(?P<commas>,,+)')
+    re_js_links = _compile_linear(r'(?i)\[([^\]]+)\]\((?:javascript|data):[^\)]+\)')
+    re_junk_space = _compile_linear(r'(?P<spaces> {2,})|(?P<newlines>\n{3,})')
+    # \w в re2 только ASCII, кириллица не считалась бы словами — оставляем re
+    re_word = re.compile(r'\w+')
+    # Backreference не поддерживается re2
+    re_repeated_chars = re.compile(r'(.)\1{' + str(REPEATED_CHAR_RUN - 1) + ',}')
+    # Меняем: только удаляем ## и ### (и ####) в начале строки, не всю строку
+    re_md_heading = _compile_linear(r'(?m)(^[ \t]*#{2,4}[ \t]*)')
+    re_latex_block = _compile_linear(r"\$\$([\s\S]*?)\$\$")
+    re_latex_inline = _compile_linear(r"\$([^\$]+?)\$")
+    # Markdown to Telegram HTML: все конструкции одним проходом, ветка выбирается по m.lastgroup.
+    # Порядок ветвей важен: ``` раньше `, ** раньше *. Lookaround существенен (***x***), поэтому re, не re2
+    re_markdown = re.compile(
+        r'(?P<url>\[(?P<url_text>[^\]]+)\]\((?P<url_href>https?://[^\)]+)\))'
+        r'|(?P<code>```(?P<code_body>.*?)```)'
+        r'|(?P<icode>`(?P<icode_body>[^`\n]+)`)'
+        r'|(?P<b1>(?<!\*)\*\*(?P<b1_body>[^\*]+)\*\*(?!\*))'
+        r'|(?P<b2>__(?P<b2_body>[^_]+)__)'
+        # Тело курсива может содержать вложенный жирный (*a **b** c*), он раскрывается рекурсией.
+        # Вложенный ** с теми же lookaround, что и b1, поэтому ***x*** по-прежнему не трогаем
+        r'|(?P<i1>(?<!\*)\*(?P<i1_body>(?:[^\*]|(?<!\*)\*\*[^\*]+\*\*(?!\*))+)\*(?!\*))'
+        r'|(?P<i2>(?<!_)_(?P<i2_body>(?:[^_]|__[^_]+__)+)_(?!_))'
+        r'|(?P<s>~~(?P<s_body>[^~]+)~~)',
+        re.DOTALL
+    )
+    # Один символ emoji (см. _EMOJI_RANGES)
+    re_emoji_char = _compile_linear(
+        '[' + ''.join(f'{chr(lo)}-{chr(hi)}' for lo, hi in _EMOJI_RANGES) + ']'
+    )
+
     def __init__(self, config: Optional[Dict] = None):
         self.logger = logging.getLogger(self.__class__.__name__)
         self.config = config or {}
-        self._init_patterns()
         self._load_config_overrides()
 
     def _load_config_overrides(self):
-        self.TELEGRAM_TEXT_LIMIT = int(self.config.get("content_validator", {}).get("max_length_no_media", self.TELEGRAM_TEXT_LIMIT))
-        self.TELEGRAM_SAFE_LIMIT = int(self.config.get("content_validator", {}).get("max_length_with_media", self.TELEGRAM_SAFE_LIMIT))
-
-    def _init_patterns(self):
-        self.re_tag = re.compile(r'</?([a-zA-Z0-9]+)[^>]*>')
-        self.re_table_md = re.compile(
-            r'(?:\|[^\n|]+\|[^\n]*\n)+(?:\|[-:| ]+\|[^\n]*\n)+(?:\|[^\n|]+\|[^\n]*\n?)+', re.MULTILINE
-        )
-        self.re_table_html = re.compile(r'<table[\s\S]*?</table>', re.IGNORECASE)
-        self.re_think = re.compile(r'<\s*think[^>]*>.*?<\s*/\s*think\s*>', re.IGNORECASE | re.DOTALL)
-        self.re_think_frag = re.compile(r'(?i)(размышления:|---|думаю:|#\s*think\s*|^\s*think\s*:)', re.MULTILINE)
-        self.re_null = re.compile(r'\b(nan|None|null|NULL)\b', re.I)
-        self.re_unicode = re.compile(r'[\u200b-\u200f\u202a-\u202e]+')
-        self.re_hex = re.compile(r'\\x[0-9a-fA-F]{2}')
-        self.re_unicode_hex = re.compile(r'_x[0-9A-Fa-f]{4}_')
-        self.re_html_entity = re.compile(r'&[a-zA-Z0-9#]+;')
-        self.re_spaces = re.compile(r' {3,}')
-        self.re_invalid = re.compile(r'[^\x09\x0A\x0D\x20-\x7Eа-яА-ЯёЁa-zA-Z0-9.,:;!?()\[\]{}<>@#%^&*_+=/\\|\'\"`~$№-]')
-        self.re_dots = re.compile(r'\.{3,}')
-        self.re_commas = re.compile(r',,+')
-        self.re_js_links = re.compile(r'\[([^\]]+)\]\((javascript|data):[^\)]+\)', re.I)
-        self.re_multi_spaces = re.compile(r' {2,}')
-        self.re_multi_newline = re.compile(r'\n{3,}', re.MULTILINE)
-        self.re_repeated_chars = re.compile(r'(.)\1{10,}')
-        # Меняем: только удаляем ## и ### (и ####) в начале строки, не всю строку
-        self.re_md_heading = re.compile(r'(^[ \t]*#{2,4}[ \t]*)', re.MULTILINE)
-        self.re_latex_block = re.compile(r"\$\$([\s\S]*?)\$\$", re.MULTILINE)
-        self.re_latex_inline = re.compile(r"\$([^\$]+?)\$", re.DOTALL)
-        # Markdown to Telegram HTML patterns
-        self.re_md_code_block = re.compile(r'```(.*?)```', re.DOTALL)
-        self.re_md_inline_code = re.compile(r'`([^`\n]+)`')
-        self.re_md_bold1 = re.compile(r'(?<!\*)\*\*([^\*]+)\*\*(?!\*)')
-        self.re_md_bold2 = re.compile(r'__([^_]+)__')
-        self.re_md_italic1 = re.compile(r'(?<!\*)\*([^\*]+)\*(?!\*)')
-        self.re_md_italic2 = re.compile(r'(?<!_)_([^_]+)_(?!_)')
-        self.re_md_strike = re.compile(r'~~([^~]+)~~')
-        self.re_md_url = re.compile(r'\[([^\]]+)\]\((https?://[^\)]+)\)')
+        cfg = self.config.get("content_validator", {})
+        self.TELEGRAM_TEXT_LIMIT = int(cfg.get("max_length_no_media", self.TELEGRAM_TEXT_LIMIT))
+        self.TELEGRAM_SAFE_LIMIT = int(cfg.get("max_length_with_media", self.TELEGRAM_SAFE_LIMIT))
 
     def validate_content(self, text: str) -> str:
         if not isinstance(text, str):
@@ -88,48 +296,61 @@ class ContentValidator:
         if not self._content_quality_check(text):
             self.logger.warning("Content failed quality validation")
             return ""
-        return text.strip()
+        # Пробелы по краям уже убраны в _clean_junk, последующие шаги их не добавляют
+        return text
 
     def remove_thinking_blocks(self, text: str) -> str:
         if not isinstance(text, str):
             return ""
-        text = self.re_think.sub('', text)
+        # Дешёвая проверка подстроки, чтобы не запускать regex на большинстве постов
+        if '<' in text and 'think' in text.lower():
+            text = self.re_think.sub('', text)
         return text
 
     def _remove_think_variations(self, text: str) -> str:
-        text = self.re_think_frag.sub('', text)
-        return text
+        return self.re_think_frag.sub('', text)
 
     def convert_markdown_to_telegram_html(self, text: str) -> str:
-        text = self.re_md_url.sub(r'<a href="\2">\1</a>', text)
-        text = self.re_md_code_block.sub(lambda m: f"<pre>{self.escape_html(m.group(1).strip())}</pre>", text)
-        text = self.re_md_inline_code.sub(lambda m: f"<code>{self.escape_html(m.group(1).strip())}</code>", text)
-        text = self.re_md_bold1.sub(r'<b>\1</b>', text)
-        text = self.re_md_bold2.sub(r'<b>\1</b>', text)
-        text = self.re_md_italic1.sub(r'<i>\1</i>', text)
-        text = self.re_md_italic2.sub(r'<i>\1</i>', text)
-        text = self.re_md_strike.sub(r'<s>\1</s>', text)
+        return self.re_markdown.sub(self._markdown_repl, text)
+
+    def _markdown_repl(self, m) -> str:
+        kind = m.lastgroup
+        if kind == "url":
+            label = self._convert_nested_markdown(m.group("url_text"))
+            return f'<a href="{m.group("url_href")}">{label}</a>'
+        if kind == "code":
+            return f"<pre>{self.escape_html(m.group('code_body').strip())}</pre>"
+        if kind == "icode":
+            return f"<code>{self.escape_html(m.group('icode_body').strip())}</code>"
+        # Вложенная разметка внутри жирного/курсива/зачёркнутого
+        tag = self.MARKDOWN_TAGS[kind]
+        inner = self._convert_nested_markdown(m.group(f"{kind}_body"))
+        return f"<{tag}>{inner}</{tag}>"
+
+    def _convert_nested_markdown(self, text: str) -> str:
+        # Без этих символов re_markdown ничего не найдёт — не заходим в regex ради каждого тела
+        for ch in self.MARKDOWN_CHARS:
+            if ch in text:
+                return self.convert_markdown_to_telegram_html(text)
         return text
 
     def escape_html(self, text: str) -> str:
-        return (
-            text.replace("&", "&amp;")
-                .replace("<", "&lt;")
-                .replace(">", "&gt;")
-        )
+        return text.translate(self.HTML_ESCAPE)
 
     def _remove_forbidden_html_tags(self, text: str) -> str:
-        def _strip_tag(m):
-            tag = m.group(1).lower()
-            if tag in self.ALLOWED_TAGS:
-                return m.group(0)
-            return ''
-        return self.re_tag.sub(_strip_tag, text)
+        if '<' not in text:
+            return text
+        return self.re_forbidden_tag.sub('', text)
 
     def _remove_tables_and_thinking(self, text: str) -> str:
-        text = self.re_table_md.sub('', text)
-        text = self.re_table_html.sub('', text)
-        text = self.re_think.sub('', text)
+        if '|' in text:
+            text = self.re_table_md.sub('', text)
+        if '<' in text:
+            lowered = text.lower()
+            if '<table' in lowered:
+                text = self.re_table_html.sub('', text)
+            if 'think' in lowered:
+                text = self.re_think.sub('', text)
         return text
 
     def _clean_junk(self, text: str) -> str:
@@ -138,77 +359,105 @@ class ContentValidator:
             if m.group(0):
                 self.logger.info(f"Удалена решетка: '{m.group(0)}'")
             return ''
-        text = self.re_md_heading.sub(log_and_sub_heading, text)
+        if '##' in text:
+            text = self.re_md_heading.sub(log_and_sub_heading, text)
         # 2. Удаляем LaTeX-блоки и inline-$, оставляем формулу без маркеров
-        text = self.re_latex_block.sub(lambda m: m.group(1).strip(), text)
-        text = self.re_latex_inline.sub(lambda m: m.group(1).strip(), text)
-        # 3. Прочая очистка
-        text = self.re_null.sub('', text)
-        text = self.re_unicode.sub('', text)
-        text = self.re_hex.sub('', text)
-        text = self.re_unicode_hex.sub('', text)
-        text = self.re_html_entity.sub('', text)
-        text = self.re_spaces.sub('  ', text)
-        text = self.re_invalid.sub('', text)
-        text = self.re_dots.sub('…', text)
-        text = self.re_commas.sub(',', text)
-        text = self.re_js_links.sub(r'\1', text)
-        text = self.re_multi_spaces.sub(' ', text)
-        text = self.re_multi_newline.sub('\n\n', text)
+        if '$' in text:
+            if '$$' in text:
+                text = self.re_latex_block.sub(lambda m: m.group(1).strip(), text)
+            text = self.re_latex_inline.sub(lambda m: m.group(1).strip(), text)
+        # 3. Прочая очистка: удаление мусора, недопустимых символов, затем нормализация.
+        # Удаление идёт до нормализации, чтобы "a None b" схлопнулось в "a b", как и раньше.
+        has_junk = self._may_contain_junk(text)
+        if has_junk:
+            text = self.re_junk_drop.sub('', text)
+        cleaned = self._remove_invalid_chars(text)
+        # Удалённые символы могли склеить новые повторы пробелов, точек, запятых
+        if has_junk or cleaned is not text:
+            cleaned = self.re_junk_punct.sub(self._junk_repl, cleaned)
+            cleaned = self.re_js_links.sub(r'\1', cleaned)
+            cleaned = self.re_junk_space.sub(self._junk_repl, cleaned)
+        text = cleaned
         return text.strip()
 
+    def _may_contain_junk(self, text: str) -> bool:
+        """
+        Один SIMD-проход hyperscan по всем триггерам _clean_junk.
+        False — мусора точно нет; без hyperscan всегда True.
+        """
+        if _JUNK_PREFILTER is None:
+            return True
+        try:
+            data = text.encode("utf-8")
+        except UnicodeEncodeError:
+            return True
+        found = []
+        try:
+            _JUNK_PREFILTER.scan(data, match_event_handler=_stop_on_match, context=found)
+        except hyperscan.ScanTerminated:
+            pass
+        return bool(found)
+
+    def _remove_invalid_chars(self, text: str) -> str:
+        # Множество символов строится в C; translate нужен, только если нашлись недопустимые
+        invalid = set(text).difference(self.ALLOWED_CHARS)
+        if not invalid:
+            return text
+        return text.translate(dict.fromkeys(map(ord, invalid)))
+
+    def _junk_repl(self, m) -> str:
+        return self.JUNK_REPLACEMENTS[m.lastgroup]
+
     def _filter_emoji_spam(self, text: str) -> str:
-        chars = list(text)
-        emojis = [c for c in chars if self._is_emoji(c)]
         if not text:
             return ""
-        emoji_fraction = len(emojis) / max(len(chars), 1)
-        if emoji_fraction > self.MAX_EMOJI_FRACTION:
+        emoji_count, long_run = self._scan_emoji(text)
+        if emoji_count / len(text) > self.MAX_EMOJI_FRACTION:
             self.logger.warning("Too many emojis in text, likely spam")
             return ""
-        if self._has_long_emoji_run(chars):
+        if long_run:
             self.logger.warning("Emoji spam detected (long run)")
             return ""
         return text
 
-    def _is_emoji(self, char: str) -> bool:
-        try:
-            return emoji.is_emoji(char)
-        except Exception:
-            return bool(re.match(
-                r'[\U0001F600-\U0001F64F\U0001F300-\U0001F5FF\U0001F680-\U0001F6FF'
-                r'\U0001F700-\U0001F77F\U0001F780-\U0001F7FF\U0001F800-\U0001F8FF'
-                r'\U0001F900-\U0001F9FF\U0001FA00-\U0001FA6F\U0001FA70-\U0001FAFF'
-                r'\U00002702-\U000027B0\U000024C2-\U0001F251]+', char)
-            )
-
-    def _has_long_emoji_run(self, chars) -> bool:
-        if not chars:
-            return False
+    def _scan_emoji(self, text: str):
+        """
+        Один проход regex по тексту: количество emoji и наличие
+        MAX_EMOJI_RUN (и более) одинаковых emoji подряд.
+        """
+        # Все диапазоны emoji вне ASCII; isascii() не сканирует строку и не выделяет память
+        if text.isascii():
+            return 0, False
+        # MAX_EMOJI_RUN — константа класса (конфиг её не меняет); атрибут читается один раз до цикла
+        max_run = self.MAX_EMOJI_RUN
+        count = 0
+        long_run = False
         last = None
+        last_pos = -2
         run = 0
-        for c in chars:
-            if self._is_emoji(c):
-                if c == last:
-                    run += 1
-                    if run >= self.MAX_EMOJI_RUN:
-                        return True
-                else:
-                    last = c
-                    run = 1
+        for m in self.re_emoji_char.finditer(text):
+            count += 1
+            pos = m.start()
+            c = m.group()
+            if pos == last_pos + 1 and c == last:
+                run += 1
+                if run >= max_run:
+                    long_run = True
             else:
-                last = None
-                run = 0
-        return False
+                last = c
+                run = 1
+            last_pos = pos
+        return count, long_run
 
     def _ensure_telegram_limits(self, text: str) -> str:
         if len(text) <= self.TELEGRAM_TEXT_LIMIT:
             return text
-        cut = self.TELEGRAM_SAFE_LIMIT
-        for i in range(cut - 100, cut):
-            if i < len(text) and text[i] in [".", "!", "?", "\n\n"]:
-                cut = i + 1
-                break
+        # Ищем последнюю границу предложения в последних 100 символах до безопасного лимита
+        hi = self.TELEGRAM_SAFE_LIMIT
+        lo = max(hi - 100, 0)
+        window = text[lo:hi]
+        best = max(window.rfind("."), window.rfind("!"), window.rfind("?"), window.rfind("\n\n"))
+        cut = lo + best + 1 if best >= 0 else hi
         truncated = text[:cut].rstrip()
         if not truncated.endswith(('...', '…')):
             truncated += '…'
@@ -217,9 +466,21 @@ class ContentValidator:
     def _content_quality_check(self, text: str) -> bool:
         if not text or len(text) < self.MIN_CONTENT_LENGTH:
             return False
-        word_count = len(re.findall(r'\w+', text))
+        # Достаточно найти три слова, весь список не нужен
+        word_count = 0
+        for _ in self.re_word.finditer(text):
+            word_count += 1
+            if word_count >= 3:
+                break
         if word_count < 3:
             return False
-        if self.re_repeated_chars.search(text):
+        if self._has_repeated_chars(text):
             return False
         return True
+
+    def _has_repeated_chars(self, text: str) -> bool:
+        # Backreference — медленная часть regex; с numba это линейный проход с ранним выходом
+        cp = _codepoints(text) if _has_char_run_codepoints is not None else None
+        if cp is not None:
+            return bool(_has_char_run_codepoints(cp, self.REPEATED_CHAR_RUN))
+        return self.re_repeated_chars.search(text) is not None